@@ -1,4 +1,13 @@
+import copy
+import math
+import random
+import threading
+import time
+from array import array
 from abc import ABC, abstractmethod
+from types import MappingProxyType
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 
 
@@ -11,35 +20,149 @@ class PlayerType(Enum):
     AI = 1
 
 
+class TTFlag(Enum):
+    # Bound type of a transposition table entry relative to the search window it was stored with
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+# Cached search result: remaining depth searched, negamax value, bound flag and the best
+# transition's column index in the node it was stored from
+TTEntry = namedtuple( 'TTEntry', 'depth value flag best_move' )
+
+
+# Node values are stored as int16 fixed-point: the float a subclass hands to set_value is
+# scaled by _VALUE_SCALE and clamped to +/-_VALUE_MAX. Minimax only needs the order relation,
+# not sub-point precision, and the typecode 'h' arrays hold two bytes per value instead of a
+# 28-byte Python float, quadrupling cache residency of per-node state
+_VALUE_SCALE = 1024
+_VALUE_MAX = 32767
+# int16 minimum, reserved to mean "not yet searched" (previously None)
+_VALUE_UNSET = -32768
+
+# Width of the null window used by principal variation search. Fails high or low for any
+# value outside (alpha, alpha + epsilon), which is all a probe needs to prove. One is the
+# smallest representable step in fixed-point units
+_PVS_EPSILON = 1
+
+# Initial half-width of the aspiration window around the previous iteration's root score,
+# a quarter point in fixed-point units. Doubled on every fail-high or fail-low so repeated
+# misses cannot thrash
+_ASPIRATION_DELTA = _VALUE_SCALE // 4
+
+
+def _make_scan( fanout ):
+    # Generates the frontier scan loop unrolled for a fixed maximum fan-out. Many games have
+    # a small constant branching factor (tic-tac-toe 9, Connect-4 7), so the for-loop
+    # bookkeeping can be compiled away once at tree construction: the emitted function is a
+    # straight line of n guarded blocks working purely on local names
+    lines = ['def _scan_f%d( indices, child_values, current_players, values, best_moves, n ):' % fanout]
+    for i in range( fanout ):
+        lines.append( '    if n <= %d: return' % i )
+        lines.append( '    i = indices[%d]' % i )
+        lines.append( '    player = current_players[i]' )
+        lines.append( '    value = child_values[i]' )
+        lines.append( '    current = values[player]' )
+        lines.append( '    if current == _VALUE_UNSET or value > current:' )
+        lines.append( '        values[player] = value' )
+        lines.append( '        best_moves[player] = i' )
+    namespace = { '_VALUE_UNSET': _VALUE_UNSET }
+    exec( '\n'.join( lines ), namespace )
+    return namespace['_scan_f%d' % fanout]
+
+
+def _search_subtree( node, player_index, depth ):
+    # Worker entry point for root-parallel search
+    # The node arrives pickled into the worker process together with its tree, including a
+    # snapshot of the transposition table, and is searched with a fresh full window. Only the
+    # resulting value travels back to the parent process
+    return node._negamax( player_index, -math.inf, math.inf, depth )
+
+
+def zobrist_keys( count, seed=None ):
+    # Generates random 64-bit keys for incremental Zobrist hashing
+    # Subclasses of Node typically draw one key per (cell, player) pair and XOR the key of each
+    # move into self._zobrist as the game state changes
+    rng = random.Random( seed )
+    return [rng.getrandbits( 64 ) for _ in range( count )]
+
+
 # Min-max tree which defines search parameters and information about the game
 class MinMaxTree:
-    def __init__(self, players=None):
+    def __init__(self, players=None, tt_size=None, max_fanout=None):
         # Initializes the tree
-        # players   - A dictionary of players with the value being a PlayerType
+        # players       - A dictionary of players with the value being a PlayerType
+        # tt_size       - Maximum number of positions cached in the transposition table.
+        #                 None leaves the table unbounded
+        # max_fanout    - Optional hint for the game's maximum branching factor. When given,
+        #                 an unrolled scan function is generated once and used for nodes with
+        #                 at most this many transitions
         if players is None:
-            self.__players = {}
+            self._players = {}
         else:
-            self.__players = players.copy()
+            self._players = players.copy()
+        self._index_players()
         self._nodes = {}
+        self._tt = {}
+        self._tt_size = tt_size
+        # Principal variation: best known transition per player at the last searched root
+        self._pv = {}
+        # Number of null-window probes that failed high and forced a full re-search.
+        # A high ratio against nodes searched means the move ordering needs work
+        self._pvs_researches = 0
+        # Move-ordering perturbation used by Lazy SMP helper threads. None on the main search
+        self._search_jitter = None
+        self._max_fanout = max_fanout
+        self._scan = _make_scan( max_fanout ) if max_fanout else None
 
     # Properties
     @property
     def players( self ):
-        return self.__players
+        # Read-only view of the player dictionary. A view instead of a copy: update_players
+        # runs once per node per tree update, and copying the dict each time allocated
+        # O(nodes x players) garbage. The setter still copies on write
+        return MappingProxyType( self._players )
 
     @players.setter
     def players( self, players ):
-        self.__players = players.copy()
-
-        for node in self._nodes:
-            node.update_players()
+        # Build a remap table from the old dense indices to the new ones before re-indexing
+        # so nodes can carry their per-player state and transition columns across the re-key.
+        # -1 marks a player that was removed
+        old_ids = self._player_ids
+        self._players = players.copy()
+        self._index_players()
+        remap = [self._player_idx.get( player, -1 ) for player in old_ids]
+
+        for node in self._nodes.values():
+            node.update_players( remap )
+
+    def _index_players( self ):
+        # Renumbers the players densely as 0..N-1 so nodes can store per-player state in
+        # fixed-size lists indexed by position instead of dicts keyed by player id
+        self._player_ids = tuple( self._players.keys() )
+        self._player_idx = { player: i for i, player in enumerate( self._player_ids ) }
+        self._num_players = len( self._player_ids )
+
+    # Pickling support for the parallel search modes: the exec-generated scan function has no
+    # importable module, so it is dropped from the state and rebuilt from the fanout hint
+    def __getstate__( self ):
+        state = self.__dict__.copy()
+        state['_scan'] = None
+        return state
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        if self._max_fanout:
+            self._scan = _make_scan( self._max_fanout )
 
     def is_player( self, player ):
-        return player in self.__players.keys()
+        return player in self._players.keys()
 
     @property
     def num_players( self ):
-        return len( self.__players.keys() )
+        # Cached by _index_players; only changes when the player set does
+        return self._num_players
 
     @property
     def nodes( self ):
@@ -57,24 +180,194 @@ class MinMaxTree:
         return self._nodes.pop( id, None )
 
     def update_node_id( self, old_id ):
-        node = self.remove_node( old_id )
-        self.add_node( node )
+        # Moves a node's registry entry from old_id to its current id in one dict swap.
+        # Ids change during Node construction, so this sits on the tree-building hot path;
+        # a missing old_id is left alone rather than silently re-registering None
+        node = self._nodes.pop( old_id, None )
+        if node is not None:
+            self._nodes[node.id] = node
 
     def update_nodes( self ):
-        for node in self._nodes:
+        for node in self._nodes.values():
             node.update()
 
+    def search( self, root_id, max_depth, time_limit=None, num_workers=1 ):
+        # Iterative-deepening search driver
+        # Searches the tree from the given root at depth 1, 2, ... max_depth, reusing each
+        # iteration's best moves to order the next, deeper iteration. This costs only ~b/(b-1)
+        # extra work but keeps alpha-beta pruning near-optimal and gives anytime behavior:
+        # the search can be stopped at any depth with a complete result from the previous one
+        # root_id       - Id of the node to search from
+        # max_depth     - Deepest iteration to run. Negative values are searched as a single
+        #                 unbounded update
+        # time_limit    - Optional wall-clock budget in seconds. No new iteration is started
+        #                 after the deadline passes
+        # num_workers   - Number of worker processes for root-parallel search. With more than
+        #                 one worker, each root subtree is searched in its own process,
+        #                 sidestepping the GIL. Node subclasses must then be picklable
+        # Returns the depth of the last completed iteration
+        root = self.get_node( root_id )
+        if num_workers > 1:
+            with ProcessPoolExecutor( max_workers=num_workers ) as executor:
+                return self._search_loop( root, max_depth, time_limit, executor )
+        return self._search_loop( root, max_depth, time_limit, None )
+
+    def _search_loop( self, root, max_depth, time_limit, executor ):
+        if max_depth < 0:
+            if executor is None:
+                root.update()
+            else:
+                root.update_parallel( -1, executor )
+            self._store_pv( root )
+            return max_depth
+
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        completed = 0
+        prev_score = None
+        delta = _ASPIRATION_DELTA
+        for depth in range( 1, max_depth + 1 ):
+            if deadline is not None and time.monotonic() > deadline:
+                break
+            if executor is not None:
+                root.update_parallel( depth, executor )
+            elif prev_score is None or math.isinf( prev_score ):
+                root.update( depth=depth, alpha=-math.inf, beta=math.inf )
+            else:
+                # Aspiration window: seed the search with a narrow window around the previous
+                # iteration's score instead of the full (-inf, inf) window, and only widen the
+                # failed side when the score lands outside it
+                alpha = prev_score - delta
+                beta = prev_score + delta
+                root.update( depth=depth, alpha=alpha, beta=beta )
+                score = self._root_score( root )
+                if score is not None and score <= alpha:
+                    delta *= 2
+                    root.update( depth=depth, alpha=-math.inf, beta=prev_score + delta )
+                elif score is not None and score >= beta:
+                    delta *= 2
+                    root.update( depth=depth, alpha=prev_score - delta, beta=math.inf )
+            prev_score = self._root_score( root )
+            completed = depth
+            self._store_pv( root )
+        return completed
+
+    def _root_score( self, root ):
+        # Best known score at the root across players in fixed-point units, used to seed the
+        # aspiration window
+        scores = [value for value in root._values if value != _VALUE_UNSET]
+        return max( scores ) if scores else None
+
+    def search_lazy_smp( self, root_id, max_depth, num_threads=2, time_limit=None ):
+        # Lazy SMP search
+        # The main search runs as usual while num_threads - 1 helper threads search deep
+        # copies of the tree from the same root, staggered one ply deeper on every other
+        # helper and with slightly jittered move ordering to diversify exploration. The
+        # helpers communicate only through the shared transposition table, so this mode only
+        # pays off when nodes maintain a Zobrist hash. Under CPython's GIL the helpers mostly
+        # serve to warm the shared table for the main search; subclasses whose update_values
+        # releases the GIL (e.g. native evaluation code) see real concurrency
+        # Returns the depth of the last iteration completed by the main search
+        root = self.get_node( root_id )
+        helpers = []
+        for n in range( 1, num_threads ):
+            # Deep-copy the tree for the helper but share the transposition table dict, whose
+            # individual probes and stores are atomic under the GIL
+            memo = { id( self._tt ): self._tt }
+            helper_tree = copy.deepcopy( self, memo )
+            helper_tree._search_jitter = random.Random( n )
+            helper_root = helper_tree.get_node( root_id )
+            thread = threading.Thread( target=helper_tree._search_loop,
+                                       args=( helper_root, max_depth + n % 2, time_limit, None ) )
+            thread.start()
+            helpers.append( thread )
+
+        completed = self._search_loop( root, max_depth, time_limit, None )
+        for thread in helpers:
+            thread.join()
+        return completed
+
+    def _store_pv( self, root ):
+        # Stashes the root's best transitions as the principal variation for the next iteration
+        for player in self._players.keys():
+            self._pv[player] = root.best_transition( player )
+
+    # Transposition table functions
+    # Each position hash maps to two buckets: a depth-preferred entry and an always-replace
+    # entry, so deep results survive while shallow ones stay fresh
+    def tt_probe( self, key, depth ):
+        # Returns the cached entry for key searched to at least the given depth, or None
+        entries = self._tt.get( key )
+        if entries is None:
+            return None
+        for entry in entries:
+            if entry is not None and entry.depth >= depth:
+                return entry
+        return None
+
+    def tt_store( self, key, entry ):
+        # Caches a search result for key, replacing by depth
+        entries = self._tt.get( key )
+        if entries is None:
+            if self._tt_size is not None and len( self._tt ) >= self._tt_size:
+                return
+            self._tt[key] = [entry, None]
+        elif entry.depth >= entries[0].depth:
+            entries[0] = entry
+        else:
+            entries[1] = entry
+
+    def tt_clear( self ):
+        self._tt.clear()
+
 
 class Node(ABC):
 
+    # Nodes are allocated by the thousands, so attributes live in __slots__ instead of a
+    # per-instance __dict__ (roughly 40% smaller objects). Subclasses may declare their own
+    # __slots__ or fall back to a __dict__ for their extra attributes
+    # Attributes use a single leading underscore: double-underscore names are name-mangled on
+    # every access, which is measurable overhead in the update loop
+    __slots__ = ( '_tree', '_id', '_expanded', '_values', '_best_moves', '_zobrist',
+                  '_tx_end', '_tx_cur', '_tx_next', '_tx_action', '_tx_order',
+                  '_tx_active', '_tx_removed', '_tx_by_player', '_child_values' )
+
     # Initialization
     def __init__(self, min_max_tree):
         self._tree = min_max_tree
-        self.__id = None
+        self._id = None
         self._expanded = False
-        self._values = {}
-        self.transitions = []
-        self.__best_moves = {}
+        # Per-player state is stored in fixed-size sequences indexed by the tree's dense
+        # player index (see MinMaxTree._player_idx) so the update loop avoids dict hashing.
+        # Values live in an int16 fixed-point array (see _VALUE_SCALE) and best moves in an
+        # int array of transition column indices, -1 meaning "no best move known". A few
+        # bytes per node against hundreds for a per-node dict of Python objects
+        self._values = array( 'h' )
+        self._best_moves = array( 'i' )
+        # Zobrist hash of the game state. Subclasses that want transposition table lookups
+        # should maintain this incrementally by XORing the zobrist_keys() key of each move.
+        # Nodes left at None are never cached
+        self._zobrist = None
+
+        # Transitions are stored as parallel columns (structure-of-arrays) rather than a list
+        # of Transition objects, so the update loop walks flat lists instead of chasing object
+        # pointers. _tx_order holds the active column indices in search order; best moves are
+        # recorded as indices into the columns
+        self._tx_end = []
+        self._tx_cur = []
+        self._tx_next = []
+        self._tx_action = []
+        self._tx_order = []
+        # Tombstone flags: removal just clears a flag (O(1)) and the next traversal compacts
+        # the search order in one pass. _tx_removed counts pending tombstones
+        self._tx_active = array( 'b' )
+        self._tx_removed = 0
+        # Column indices grouped by dense current-player index, so the frontier reduction can
+        # run as one independent max per player instead of dispatching on the player per
+        # transition. Built by update_players and maintained by add_transition
+        self._tx_by_player = []
+        # Scratch column of negated child values, refilled by _gather_child_values and reused
+        # between updates to avoid reallocating it every pass
+        self._child_values = []
 
         # Initialize id
         self.init_id()
@@ -89,14 +382,16 @@ class Node(ABC):
     # Properties
     @property
     def id( self ):
-        return self.__id
+        return self._id
 
     @id.setter
     def id( self, id ):
         # Sets the Node ID and updates the MinMaxTree
         # For efficiency it is recommended this property be set once and not change
-        old_id = self.__id
-        self.__id = id
+        old_id = self._id
+        if old_id == id:
+            return
+        self._id = id
         if old_id is None:
             self._tree.add_node( self )
         else:
@@ -104,20 +399,92 @@ class Node(ABC):
 
     @property
     def values( self ):
-        return self._values.copy()
+        return { player: self.value( player ) for player in self._tree._player_ids }
 
     def value( self, player ):
-        return self._values[player]
+        # Returns the node's value for the given player as a float, or None if the player's
+        # value was pruned away and never searched
+        value = self._values[self._tree._player_idx[player]]
+        return value / _VALUE_SCALE if value != _VALUE_UNSET else None
+
+    def set_value( self, player, value ):
+        # Sets this node's value for the given player, quantizing the float to the int16
+        # fixed-point storage. Intended for use by update_values implementations, which should
+        # not index the per-player storage by player id directly
+        # Clamp before converting: +/-inf are conventional terminal scores and would overflow
+        # int(), so they saturate to the int16 extremes instead
+        scaled = value * _VALUE_SCALE
+        if scaled > _VALUE_MAX:
+            quantized = _VALUE_MAX
+        elif scaled < -_VALUE_MAX:
+            quantized = -_VALUE_MAX
+        else:
+            quantized = int( scaled )
+        self._values[self._tree._player_idx[player]] = quantized
 
     def best_move( self, player ):
-        return self.__best_moves[player].action
+        # Returns the action of the best known transition for the given player, or None
+        index = self._best_moves[self._tree._player_idx[player]]
+        return self._tx_action[index] if index >= 0 else None
+
+    def best_transition( self, player ):
+        # Returns the best known transition for the given player, or None if not yet searched
+        index = self._best_moves[self._tree._player_idx[player]]
+        return self.transition( index ) if index >= 0 else None
 
     # Transition functions
+    # Transition objects are decomposed into the column arrays on insertion; the Transition
+    # class remains the construction and inspection record
+    @property
+    def transitions( self ):
+        # Materializes the active transitions in search order
+        return [self.transition( i ) for i in self._tx_order if self._tx_active[i]]
+
+    @property
+    def num_transitions( self ):
+        return len( self._tx_order ) - self._tx_removed
+
+    def transition( self, index ):
+        # Materializes the transition stored at the given column index
+        player_ids = self._tree._player_ids
+        transition = Transition( self, self._tx_end[index], player_ids[self._tx_cur[index]],
+                                 player_ids[self._tx_next[index]], self._tx_action[index] )
+        transition._idx = index
+        return transition
+
     def add_transition( self, transition ):
-        self.transitions.append( transition )
+        # Player ids are converted to the tree's dense indices once here so the update loop
+        # never has to hash them again
+        player_idx = self._tree._player_idx
+        index = len( self._tx_end )
+        self._tx_end.append( transition.end_node )
+        self._tx_cur.append( player_idx[transition.current_player] )
+        self._tx_next.append( player_idx[transition.next_player] )
+        self._tx_action.append( transition.action )
+        self._tx_order.append( index )
+        self._tx_active.append( 1 )
+        self._tx_by_player[self._tx_cur[index]].append( index )
+        transition._idx = index
+        return index
 
     def remove_transition( self, transition ):
-        self.transitions.remove( transition )
+        # O(1): flags the column as inactive; the search order is compacted lazily by the
+        # next traversal instead of paying a linear list.remove here
+        index = transition._idx
+        if index is not None and self._tx_active[index]:
+            self._tx_active[index] = 0
+            self._tx_removed += 1
+
+    def _active_order( self ):
+        # Search order with tombstoned transitions compacted away. The first traversal after
+        # removals pays one linear filter; every other call returns the list as is
+        if self._tx_removed:
+            active = self._tx_active
+            self._tx_order = [i for i in self._tx_order if active[i]]
+            self._tx_by_player = [[i for i in group if active[i]]
+                                  for group in self._tx_by_player]
+            self._tx_removed = 0
+        return self._tx_order
 
     # Expansion functions
     @abstractmethod
@@ -137,7 +504,7 @@ class Node(ABC):
         raise NotImplementedError
 
     # Update process
-    def update( self ):
+    def update( self, depth=-1, alpha=-math.inf, beta=math.inf ):
         # Updates the value of this node based on its state and children
         # This function has been stripped to only the necessary calculations needed each time
         # The node will be updated with the optimal move for each AI player.
@@ -147,30 +514,235 @@ class Node(ABC):
         #   - update_players()
         # Functions called during the update process
         #   - update_values()
-        if not self._expanded or self.terminal:
+        # depth         - Remaining search depth. Negative values search until terminal nodes
+        # alpha, beta   - Negamax search window. Transitions are pruned once alpha >= beta,
+        #                 so values of pruned branches may only be lower bounds
+        if not self._expanded and depth != 0:
+            self.expand( depth )
+
+        if not self._expanded or self.terminal or depth == 0:
             self.update_values()
-        else:
-            # Reset best moves
-            for key in self.__best_moves.keys():
-                self.__best_moves[key] = None
-                self._values[key] = None
-
-            # Search through children for the best move for each AI player
-            for transition in self.transitions:
-                end_value = transition.end_node.value( transition.next_player )
-                if self._values[transition.current_player] is None or -end_value > self._values[transition.current_player]:
-                    self._values[transition.current_player] = -end_value
-                    self.__best_moves[transition.current_player] = transition
-
-    def update_players( self ):
-        # Updates the number of players from the MinMaxTree.
-        # If the number of players has changed, all values will be set to zero
-        if self._tree.num_players != len( self._values.keys() ):
-            self._values.clear()
-            self.__best_moves.clear()
-            for key in self._tree.players.keys():
-                self._values[key] = 0
-                self.__best_moves[key] = None
+            return
+
+        # Remember the principal variation from the previous, shallower iteration before the
+        # values are reset so it can be searched first
+        prev_best = [i for i in self._best_moves if i >= 0]
+
+        # Reset best moves
+        for j in range( len( self._values ) ):
+            self._best_moves[j] = -1
+            self._values[j] = _VALUE_UNSET
+
+        order = self._active_order()
+        tx_end = self._tx_end
+        tx_cur = self._tx_cur
+        tx_next = self._tx_next
+
+        if depth == 1:
+            # Frontier fast path: every child only needs update_values, so nothing below this
+            # node can be pruned. Bulk-gather the child scores into one flat column and reduce
+            # them in a single tight loop instead of paying the per-transition method call and
+            # window bookkeeping of the recursive path
+            for i in order:
+                tx_end[i].update( 0 )
+            gathered = self._gather_child_values()
+            scan = self._tree._scan
+            if scan is not None and len( order ) <= self._tree._max_fanout:
+                scan( order, gathered, tx_cur, self._values, self._best_moves, len( order ) )
+            else:
+                # Transitions are pre-grouped by current player, so the reduction runs as one
+                # independent max per player with the key evaluated at C speed
+                values = self._values
+                best_moves = self._best_moves
+                for player, group in enumerate( self._tx_by_player ):
+                    if group:
+                        best = max( group, key=gathered.__getitem__ )
+                        values[player] = gathered[best]
+                        best_moves[player] = best
+            return
+
+        # Order transitions so the best known move from the previous update is searched first
+        # Without this, alpha-beta rarely prunes. With a good ordering it cuts the effective
+        # branching factor from b to roughly sqrt(b)
+        # The scores from the previous update are bulk-gathered once so the sort compares
+        # plain list entries instead of calling a key method per transition
+        gathered = self._gather_child_values()
+        order.sort( key=gathered.__getitem__, reverse=True )
+        for i in reversed( prev_best ):
+            try:
+                order.remove( i )
+            except ValueError:
+                # The previous best transition has since been removed
+                continue
+            order.insert( 0, i )
+
+        # Lazy SMP helper threads perturb the ordering below the principal variation so each
+        # helper explores the tree in a different order and fills different table entries
+        jitter = self._tree._search_jitter
+        if jitter is not None and len( order ) > 2:
+            j = jitter.randrange( 1, len( order ) )
+            k = jitter.randrange( 1, len( order ) )
+            order[j], order[k] = order[k], order[j]
+
+        # Search through children for the best move for each AI player
+        # Principal variation search: the first (best-ordered) transition is searched with the
+        # full window. Later transitions only need to prove they are not better, so they get a
+        # null window around alpha and are re-searched with the full window only on fail-high
+        values = self._values
+        best_moves = self._best_moves
+        first = True
+        for i in order:
+            if first or alpha == -math.inf:
+                value = -tx_end[i]._negamax( tx_next[i], -beta, -alpha, depth - 1 )
+                first = False
+            else:
+                value = -tx_end[i]._negamax( tx_next[i], -alpha - _PVS_EPSILON, -alpha, depth - 1 )
+                if alpha < value < beta:
+                    self._tree._pvs_researches += 1
+                    value = -tx_end[i]._negamax( tx_next[i], -beta, -alpha, depth - 1 )
+            player = tx_cur[i]
+            if values[player] == _VALUE_UNSET or value > values[player]:
+                values[player] = value
+                best_moves[player] = i
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+    def update_parallel( self, depth, executor ):
+        # Root-level parallel update
+        # Sibling subtrees are independent, so each child search is dispatched to a worker
+        # process and only the returned values are reduced here. Alpha-beta cutoffs are not
+        # shared between workers, which costs some re-searched nodes, but the subtrees search
+        # truly concurrently because each worker is a separate process
+        if not self._expanded and depth != 0:
+            self.expand( depth )
+
+        if not self._expanded or self.terminal or depth == 0:
+            self.update_values()
+            return
+
+        for j in range( len( self._values ) ):
+            self._best_moves[j] = -1
+            self._values[j] = _VALUE_UNSET
+
+        tx_end = self._tx_end
+        tx_cur = self._tx_cur
+        tx_next = self._tx_next
+        futures = [( i, executor.submit( _search_subtree, tx_end[i], tx_next[i], depth - 1 ) )
+                   for i in self._active_order()]
+
+        values = self._values
+        best_moves = self._best_moves
+        for i, future in futures:
+            value = -future.result()
+            player = tx_cur[i]
+            if values[player] == _VALUE_UNSET or value > values[player]:
+                values[player] = value
+                best_moves[player] = i
+
+    def negamax_value( self, player, alpha=-math.inf, beta=math.inf, depth=-1 ):
+        # Recursively updates this node within the given search window and returns its value
+        # for the given player as a float
+        # When the node carries a Zobrist hash, results are cached in the tree's transposition
+        # table so states reached through different move orders are only searched once
+        return self._negamax( self._tree._player_idx[player], alpha, beta, depth ) / _VALUE_SCALE
+
+    def _negamax( self, player, alpha=-math.inf, beta=math.inf, depth=-1 ):
+        # Internal negamax taking the tree's dense player index. Values and the search window
+        # are in fixed-point units throughout the recursion
+        tt_depth = depth if depth >= 0 else math.inf
+        key = None
+        if self._zobrist is not None:
+            key = ( self._zobrist, player )
+            entry = self._tree.tt_probe( key, tt_depth )
+            if entry is not None:
+                if entry.flag == TTFlag.EXACT:
+                    return entry.value
+                elif entry.flag == TTFlag.LOWER and entry.value >= beta:
+                    return entry.value
+                elif entry.flag == TTFlag.UPPER and entry.value <= alpha:
+                    return entry.value
+
+        self.update( depth, alpha, beta )
+        value = self._values[player]
+        if value == _VALUE_UNSET:
+            value = 0
+
+        if key is not None:
+            # Classify the result against the original window before caching it
+            if value <= alpha:
+                flag = TTFlag.UPPER
+            elif value >= beta:
+                flag = TTFlag.LOWER
+            else:
+                flag = TTFlag.EXACT
+            self._tree.tt_store( key, TTEntry( tt_depth, value, flag, self._best_moves[player] ) )
+
+        return value
+
+    def _gather_child_values( self ):
+        # Gathers the negated child value of every transition column into one flat scratch
+        # list in a single pass. The update loop and the move-ordering sort then read plain
+        # list entries instead of doing a method call plus two indexings per transition.
+        # Unsearched children gather as 0, mirroring how _negamax treats an unset value, so
+        # the frontier reduction only ever writes int16-representable values back
+        tx_end = self._tx_end
+        tx_next = self._tx_next
+        gathered = self._child_values
+        if len( gathered ) != len( tx_end ):
+            gathered = self._child_values = [0] * len( tx_end )
+        for i in range( len( tx_end ) ):
+            value = tx_end[i]._values[tx_next[i]]
+            gathered[i] = -value if value != _VALUE_UNSET else 0
+        return gathered
+
+    def update_players( self, remap=None ):
+        # Updates the per-player state after the MinMaxTree's player set changed.
+        # remap maps each old dense player index to its new one, -1 when that player was
+        # removed; without one, players keep their positions and any extras are dropped.
+        # The common case - nothing changed - is a single cached int comparison
+        num_players = self._tree._num_players
+        if remap is None:
+            if num_players == len( self._values ):
+                return
+            remap = [i if i < num_players else -1 for i in range( len( self._values ) )]
+        elif num_players == len( self._values ) and all( j == i for i, j in enumerate( remap ) ):
+            return
+
+        # Carry each surviving player's value and best move to its new position
+        values = array( 'h', [0] * num_players )
+        best_moves = array( 'i', [-1] * num_players )
+        for old, new in enumerate( remap ):
+            if new >= 0:
+                values[new] = self._values[old]
+                best_moves[new] = self._best_moves[old]
+        self._values = values
+        self._best_moves = best_moves
+        self._remap_transitions( remap, num_players )
+
+    def _remap_transitions( self, remap, num_players ):
+        # Rewrites the dense player indices stored in the transition columns so they keep
+        # pointing at the same player ids under the new numbering. Transitions referencing a
+        # removed player are tombstoned the same way remove_transition does
+        tx_cur = self._tx_cur
+        tx_next = self._tx_next
+        active = self._tx_active
+        for i in range( len( tx_cur ) ):
+            cur = remap[tx_cur[i]]
+            nxt = remap[tx_next[i]]
+            if cur < 0 or nxt < 0:
+                if active[i]:
+                    active[i] = 0
+                    self._tx_removed += 1
+                continue
+            tx_cur[i] = cur
+            tx_next[i] = nxt
+        # Regroup the columns under the new player numbering
+        self._tx_by_player = [[] for _ in range( num_players )]
+        for i in self._tx_order:
+            if active[i]:
+                self._tx_by_player[tx_cur[i]].append( i )
 
     @abstractmethod
     def update_values( self ):
@@ -178,73 +750,31 @@ class Node(ABC):
         # It is assumed each player desires a higher value and the highest value child will be taken as the optimal move
         # This method will only be called if it is the last node in a branch. The last node could either be a terminal
         # node or the last node at the current search depth. This function should handle both cases
-        # This function should set each key's value in self._values
+        # This function should set each player's value through set_value
         raise NotImplementedError
 
-    # Comparison functions
-    def __eq__( self, node ):
-        if isinstance( node, Node ):
-            return self.id == node.id
-        else:
-            return super().__eq__( node )
+    # Comparison is by identity: every id in MinMaxTree._nodes is unique, so two distinct Node
+    # objects never represent the same entry and the default __eq__/__hash__ are correct.
+    # Defining a custom __eq__ here would also disable hashing and cost an isinstance MRO walk
+    # per comparison
 
 
 class Transition:
 
-    def __init__( self, start_node, end_node, current_player, next_player, action ):
-        self.__start_node = None
-        self.__end_node = None
-        self.__current_player = None
-        self.__next_player = None
-        self.__action = None
+    # Plain slot attributes: the old trivial property/setter pairs added a Python function
+    # call frame to every access, which matters when transitions are read in bulk
+    __slots__ = ( 'start_node', 'end_node', 'current_player', 'next_player', 'action', '_idx' )
 
+    def __init__( self, start_node, end_node, current_player, next_player, action ):
+        if not isinstance( start_node, Node ):
+            raise TypeError
+        if not isinstance( end_node, Node ):
+            raise TypeError
         self.start_node = start_node
         self.end_node = end_node
         self.current_player = current_player
         self.next_player = next_player
         self.action = action
-
-    @property
-    def start_node( self ):
-        return self.__start_node
-
-    @start_node.setter
-    def start_node( self, start_node ):
-        if not isinstance( start_node, Node ):
-            raise TypeError
-        self.__start_node = start_node
-
-    @property
-    def end_node( self ):
-        return self.__end_node
-
-    @end_node.setter
-    def end_node( self, end_node ):
-        if not isinstance( end_node, Node ):
-            raise TypeError
-        self.__end_node = end_node
-
-    @property
-    def current_player( self ):
-        return self.__current_player
-
-    @current_player.setter
-    def current_player( self, current_player ):
-        self.__current_player = current_player
-
-    @property
-    def next_player( self ):
-        return self.__next_player
-
-    @next_player.setter
-    def next_player( self, next_player ):
-        self.__next_player = next_player
-
-    @property
-    def action( self ):
-        return self.__action
-
-    @action.setter
-    def action( self, action ):
-        self.__action = action
+        # Column index assigned by Node.add_transition
+        self._idx = None
 
@@ -1,3 +1,5 @@
+import math
+import pickle
 import unittest
 from minmax import *
 
@@ -7,6 +9,11 @@ class TestNode( Node ):
 
     id_counter = 0
 
+    def __init__( self, tree, leaf_values=None ):
+        # leaf_values - Optional dictionary of player values applied by update_values
+        self.leaf_values = leaf_values
+        super().__init__( tree )
+
     def init_id( self ):
         self.id = TestNode.id_counter
         TestNode.id_counter += 1
@@ -14,17 +21,20 @@ class TestNode( Node ):
     def expand( self, depth = -1 ):
         return
 
+    @property
     def terminal( self ):
-        return self.id % 2 == 0
+        return self.num_transitions == 0
 
     def update_values( self ):
-        pass
+        if self.leaf_values is not None:
+            for key in self.leaf_values.keys():
+                self.set_value( key, self.leaf_values[key] )
 
 
 class MinMaxTest( unittest.TestCase ):
     players = {1:PlayerType.USER, 2:PlayerType.AI}
     tree = MinMaxTree(players)
-    node = TestNode(tree, 1)
+    node = TestNode(tree)
 
     def test_MinMaxTree( self ):
         # Test constructor
@@ -34,7 +44,7 @@ class MinMaxTest( unittest.TestCase ):
 
     def test_Node( self ):
         # Test constructor
-        node2 = TestNode(self.tree, 2)
+        node2 = TestNode(self.tree)
 
         self.assertEqual( len(self.tree.nodes), 2)
 
@@ -47,6 +57,149 @@ class MinMaxTest( unittest.TestCase ):
         self.assertEqual(self.node.id, 100)
         self.assertEqual(node2.id, 200)
 
+        # The registry follows the id change and drops the old entry
+        self.assertIs(self.tree.get_node(100), self.node)
+        self.assertNotIn(0, self.tree.nodes)
+
+        # Nodes compare by identity and stay hashable
+        self.assertNotEqual(self.node, node2)
+        self.assertEqual(len({self.node, self.node}), 1)
+
+    def test_update( self ):
+        # Build a one-ply tree and check the negamax update picks the best move
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        root = TestNode( tree )
+        left = TestNode( tree, {1:0, 2:5} )
+        right = TestNode( tree, {1:0, 2:2} )
+        root.add_transition( Transition( root, left, 1, 2, 'left' ) )
+        root.add_transition( Transition( root, right, 1, 2, 'right' ) )
+        root._expanded = True
+
+        root.update()
+        self.assertEqual( root.value(1), -2 )
+        self.assertEqual( root.best_move(1), 'right' )
+
+    def test_update_specialized( self ):
+        # A max_fanout hint generates an unrolled scan that matches the generic result
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI}, max_fanout=4 )
+        root = TestNode( tree )
+        for action, value in enumerate( [5, 2, 7] ):
+            child = TestNode( tree, {1:0, 2:value} )
+            root.add_transition( Transition( root, child, 1, 2, action ) )
+        root._expanded = True
+
+        root.update( depth=1 )
+        self.assertEqual( root.value(1), -2 )
+        self.assertEqual( root.best_move(1), 1 )
+
+    def test_remove_transition( self ):
+        # Removal tombstones the column and the next update skips it
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        root = TestNode( tree )
+        for action, value in enumerate( [5, 2, 7] ):
+            child = TestNode( tree, {1:0, 2:value} )
+            root.add_transition( Transition( root, child, 1, 2, action ) )
+        root._expanded = True
+
+        root.remove_transition( root.transitions[1] )
+        self.assertEqual( root.num_transitions, 2 )
+
+        root.update()
+        self.assertEqual( root.value(1), -5 )
+        self.assertEqual( root.best_move(1), 0 )
+
+    def test_infinite_values( self ):
+        # +/-inf is the conventional score for won/lost terminal positions; it saturates to
+        # the fixed-point extremes instead of overflowing the int16 conversion
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        root = TestNode( tree )
+        win = TestNode( tree, {1:math.inf, 2:-math.inf} )
+        draw = TestNode( tree, {1:0, 2:0} )
+        root.add_transition( Transition( root, win, 1, 2, 'win' ) )
+        root.add_transition( Transition( root, draw, 1, 2, 'draw' ) )
+        root._expanded = True
+
+        tree.search( root.id, 2 )
+        self.assertEqual( win.value(1), 32767 / 1024 )
+        self.assertEqual( win.value(2), -32767 / 1024 )
+        self.assertEqual( root.best_move(1), 'win' )
+
+    def test_players_rekey( self ):
+        # Re-keying the player dict changes the dense numbering; nodes must remap their
+        # stored values, best moves and transition columns so per-player lookups still
+        # route by player id
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        root = TestNode( tree )
+        left = TestNode( tree, {1:0, 2:5} )
+        right = TestNode( tree, {1:0, 2:2} )
+        root.add_transition( Transition( root, left, 1, 2, 'left' ) )
+        root.add_transition( Transition( root, right, 1, 2, 'right' ) )
+        root._expanded = True
+        root.update()
+
+        tree.players = {2:PlayerType.AI, 1:PlayerType.AI}
+        self.assertEqual( root.value(1), -2 )
+        self.assertEqual( root.best_move(1), 'right' )
+        self.assertEqual( root.transitions[0].current_player, 1 )
+
+        # The re-keyed columns still drive a fresh update correctly
+        root.update()
+        self.assertEqual( root.best_move(1), 'right' )
+
+        # Dropping a player tombstones the transitions that referenced it
+        tree.players = {1:PlayerType.AI, 3:PlayerType.AI}
+        self.assertEqual( root.num_transitions, 0 )
+
+    def test_tree_pickle( self ):
+        # Trees with a max_fanout hint must survive pickling for the parallel search modes;
+        # the generated scan function is rebuilt on unpickle
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI}, max_fanout=4 )
+        copied = pickle.loads( pickle.dumps( tree ) )
+        self.assertEqual( copied._max_fanout, 4 )
+        self.assertIsNotNone( copied._scan )
+
+    def test_repeated_search( self ):
+        # A deep pass can leave a child's value unset for a player with no moves there; the
+        # next shallow pass must tolerate that instead of crashing on the int16 store
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        root = TestNode( tree )
+        mid = TestNode( tree )
+        leaf = TestNode( tree, {1:4, 2:-4} )
+        root.add_transition( Transition( root, mid, 1, 2, 'm' ) )
+        mid.add_transition( Transition( mid, leaf, 2, 1, 'l' ) )
+        root._expanded = True
+        mid._expanded = True
+
+        tree.search( root.id, 2 )
+        tree.search( root.id, 2 )
+        self.assertEqual( root.best_move(1), 'm' )
+
+    def test_search( self ):
+        # Iterative deepening completes every depth and leaves the best move at the root
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        root = TestNode( tree )
+        left = TestNode( tree, {1:0, 2:5} )
+        right = TestNode( tree, {1:0, 2:2} )
+        root.add_transition( Transition( root, left, 1, 2, 'left' ) )
+        root.add_transition( Transition( root, right, 1, 2, 'right' ) )
+        root._expanded = True
+
+        completed = tree.search( root.id, 3 )
+        self.assertEqual( completed, 3 )
+        self.assertEqual( root.best_move(1), 'right' )
+
+    def test_transposition_table( self ):
+        # Nodes with a Zobrist hash cache their search results in the tree
+        tree = MinMaxTree( {1:PlayerType.AI, 2:PlayerType.AI} )
+        leaf = TestNode( tree, {1:3, 2:-3} )
+        leaf._zobrist = zobrist_keys( 1, seed=0 )[0]
+
+        self.assertEqual( leaf.negamax_value( 2 ), -3 )
+        entry = tree.tt_probe( (leaf._zobrist, tree._player_idx[2]), 0 )
+        # Cached values are stored in fixed-point units
+        self.assertEqual( entry.value / 1024, -3 )
+        self.assertEqual( entry.flag, TTFlag.EXACT )
+
 
 if __name__ == '__main__':
     unittest.main()